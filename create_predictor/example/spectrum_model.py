@@ -10,25 +10,36 @@
 
 导出文件：
 - model_info.json：记录input_size、output_size、property_labels、wavelength_labels、selected_feature_indices
-- preprocessing_params.json：记录SNV统计、StandardScaler参数、PCA均值与主成分
+- preprocessing_params.json：记录StandardScaler参数、PCA成分数及各数组文件名
+- preprocessing_params_*.npy：SNV统计、PCA均值、主成分与折叠偏置（float32）
 
-注意：若修改VIP的top_k或PCA的n_components，需重新训练并同步上述两个文件到上位机，保证推理一致。
+注意：若修改VIP的top_k或PCA的n_components，需重新训练并同步上述文件到上位机，保证推理一致。
 """
 
 import torch
 import torch.nn as nn
-import torch.utils.data as Data
+from torch.nn.utils.fusion import fuse_linear_bn_eval
 import numpy as np
 import pandas as pd
-from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.cross_decomposition import PLSRegression
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
+import matplotlib
+matplotlib.use('Agg')  # 无界面后端：训练可在无显示环境下运行，只保存图片
 import matplotlib.pyplot as plt
 import os
 import json
+import copy
+import math
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Dict
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时回退到标准库json
+    orjson = None
+
 # 以仓库根目录为基准进行路径解析，保证脚本移动后输出位置不变
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
@@ -37,6 +48,14 @@ ROOT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
 # DISABLE_TRAINING_HISTORY=0 以启用
 DISABLE_TRAINING_HISTORY = os.environ.get("DISABLE_TRAINING_HISTORY", "1").lower() in ("1", "true", "yes")
 
+# 控制训练时是否使用torch.compile。默认启用，首次运行需额外编译时间；
+# 无可用C++编译器等环境下可设置 ENABLE_TORCH_COMPILE=0 关闭
+ENABLE_TORCH_COMPILE = os.environ.get("ENABLE_TORCH_COMPILE", "1").lower() in ("1", "true", "yes")
+
+# 控制CUDA下验证前向是否捕获CUDA Graph。该路径尚未在GPU上充分验证，默认关闭；
+# 可设置 ENABLE_CUDA_GRAPH=1 启用（首轮验证后仍会与eager结果比对，不一致时自动回退）
+ENABLE_CUDA_GRAPH = os.environ.get("ENABLE_CUDA_GRAPH", "0").lower() in ("1", "true", "yes")
+
 class SpectrumPredictor(nn.Module):
     """光谱预测神经网络模型"""
     
@@ -75,26 +94,29 @@ def load_data(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.nd
     """
     print("正在加载数据...")
     
-    # 加载光谱数据
-    spec_df = pd.read_csv(spectrum_file, header=None)
-    spec_data = spec_df.iloc[9:].values
-    # print(spec_data)
+    # CSV读取参数：C解析器 + 内存映射，空字段按NaN处理
+    csv_kwargs = {'header': None, 'engine': 'c', 'memory_map': True, 'na_values': [''], 'low_memory': False}
+    
+    # 加载光谱数据：跳过前9行文件头，第一行即波长标签行，其余列均为数值
+    spec_df = pd.read_csv(spectrum_file, skiprows=9, **csv_kwargs)
+    
     # 提取波长标签（第10行）
-    wavelength_labels = spec_df.iloc[9, 2:].dropna().astype(str).tolist()
+    wavelength_labels = spec_df.iloc[0, 2:].dropna().astype(str).tolist()
     
     # 提取光谱数据（从第11行开始，跳过前2列，移除最后一列NaN）
-    spectra = spec_data[1:, 2:].astype(float)
-    spectra = spectra[:, ~np.isnan(spectra).any(axis=0)]  # 移除包含NaN的列
-    
-    # 加载属性数据
-    prop_df = pd.read_csv(property_file, header=None)
-    prop_data = prop_df.iloc[9:].values
+    spectra = spec_df.iloc[1:, 2:].to_numpy(dtype=np.float32)
+    # 只扫描一次NaN，列过滤与行过滤复用同一掩码
+    nan_mask = np.isnan(spectra)
+    col_ok = ~nan_mask.any(axis=0)
+    spectra = spectra[:, col_ok]  # 移除包含NaN的列
     
     # 提取属性标签（第9行，真正的标签行）
-    property_labels = prop_df.iloc[8, 2:].dropna().astype(str).tolist()
+    property_labels = pd.read_csv(property_file, skiprows=8, nrows=1, **csv_kwargs).iloc[0, 2:].dropna().astype(str).tolist()
     
-    # 提取属性数据（从第11行开始，只提取有标签的列）
-    properties = prop_data[1:, 2:2+len(property_labels)].astype(float)
+    # 提取属性数据（从第11行开始，只提取有标签的列），单独读取以保证各列为数值类型
+    prop_df = pd.read_csv(property_file, skiprows=10, usecols=range(2, 2 + len(property_labels)),
+                          dtype=np.float32, **csv_kwargs)
+    properties = prop_df.to_numpy()
     
     # 确保光谱数据和属性数据的行数一致
     min_rows = min(spectra.shape[0], properties.shape[0])
@@ -102,12 +124,12 @@ def load_data(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.nd
     properties = properties[:min_rows]
     
     # 只移除光谱数据中包含NaN的行
-    valid_indices = ~np.isnan(spectra).any(axis=1)
+    valid_indices = ~nan_mask[:min_rows, col_ok].any(axis=1)
     spectra = spectra[valid_indices]
     properties = properties[valid_indices]
     
     # 对于属性数据，用0填充NaN值
-    properties = np.nan_to_num(properties, nan=0.0)
+    np.nan_to_num(properties, copy=False, nan=0.0)
     
     print(f"光谱数据形状: {spectra.shape}")
     print(f"属性数据形状: {properties.shape}")
@@ -126,21 +148,14 @@ def apply_snv(spectra: np.ndarray) -> np.ndarray:
     """
     print("正在应用SNV标准化...")
     
-    # SNV标准化：对每个样本进行标准化
+    # SNV标准化：对每个样本进行标准化（按行广播，一次性完成）
     # 公式: (x - mean(x)) / std(x)
-    snv_spectra = np.zeros_like(spectra)
+    mean_val = spectra.mean(axis=1, keepdims=True)
+    std_val = spectra.std(axis=1, keepdims=True)
     
-    for i in range(spectra.shape[0]):
-        sample = spectra[i, :]
-        # 计算均值和标准差
-        mean_val = np.mean(sample)
-        std_val = np.std(sample)
-        
-        # 避免除零错误
-        if std_val > 1e-8:
-            snv_spectra[i, :] = (sample - mean_val) / std_val
-        else:
-            snv_spectra[i, :] = sample - mean_val
+    # 避免除零错误：标准差过小的样本只做去均值
+    safe_std = np.where(std_val > 1e-8, std_val, 1.0)
+    snv_spectra = ((spectra - mean_val) / safe_std).astype(spectra.dtype, copy=False)
     
     print(f"SNV标准化完成，数据形状: {snv_spectra.shape}")
     return snv_spectra
@@ -167,7 +182,7 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     """
     保存预处理参数供上位机使用
     - 目的：保证上位机复现训练时的同一处理链
-    - 写入：SNV统计（mean/std）、属性StandardScaler（mean/scale）、可选PCA（mean/components/n_components）
+    - 写入：SNV统计（mean/std，.npy旁存）、属性StandardScaler（mean/scale）、可选PCA（mean/components/bias以.npy旁存，n_components）
     Args:
         snv_spectra: SNV标准化后的光谱数据（用于计算统计信息）
         property_scaler: 属性数据标准化器
@@ -180,10 +195,17 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     spectrum_mean = np.mean(snv_spectra, axis=0)
     spectrum_std = np.std(snv_spectra, axis=0)
     
+    # 大数组以float32 .npy二进制文件旁存，JSON中只记录相对文件名与标量参数
+    # 上位机loadNpyFloat32只接受C顺序数组，写入前统一转为连续C顺序
+    def save_array(suffix: str, array: np.ndarray) -> str:
+        array_path = save_path.replace('.json', f'_{suffix}.npy')
+        np.save(array_path, np.ascontiguousarray(array, dtype=np.float32))
+        return os.path.basename(array_path)
+    
     preprocessing_params = {
         'spectrum_stats': {
-            'mean': spectrum_mean.tolist(),
-            'std': spectrum_std.tolist()
+            'mean_file': save_array('spectrum_mean', spectrum_mean),
+            'std_file': save_array('spectrum_std', spectrum_std)
         },
         'property_scaler': {
             'mean': property_scaler.mean_.tolist(),
@@ -195,9 +217,11 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     if pca is not None:
         # components_形状：(n_components, n_features_after_VIP)
         # 上位机将以mean_长度作为期望特征数，先对VIP后的特征对齐，再执行投影
+        # bias = -components @ mean：上位机可直接做 y = components @ x + bias，省去去均值步骤
         preprocessing_params['pca'] = {
-            'mean': pca.mean_.tolist(),
-            'components': pca.components_.tolist(),
+            'mean_file': save_array('pca_mean', pca.mean_),
+            'components_file': save_array('pca_components', pca.components_),
+            'bias_file': save_array('pca_bias', -pca.components_ @ pca.mean_),
             'n_components': int(pca.n_components_)
         }
     
@@ -206,23 +230,79 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     
     print(f"预处理参数已保存到: {save_path}")
 
-def compute_vip_scores(X: np.ndarray, Y: np.ndarray, n_components: int = 10) -> np.ndarray:
+def _simpls(X: np.ndarray, Y: np.ndarray, n_components: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SIMPLS偏最小二乘（de Jong, 1993），全部由矩阵乘法与SVD完成，不对X做紧缩
+    - 与PLSRegression(scale=True)一致，先中心化并按样本标准差缩放X、Y
+    Args:
+        X: 特征矩阵 (n_samples, n_features)
+        Y: 目标矩阵 (n_samples, n_targets)
+        n_components: PLS成分数
+    Returns:
+        (R, T, Q)：X权重 (n_features, c)、单位范数X得分 (n_samples, c)、Y载荷 (n_targets, c)
+    """
+    X = np.array(X, dtype=np.float64)
+    Y = np.array(Y, dtype=np.float64)
+    X -= X.mean(axis=0)
+    Y -= Y.mean(axis=0)
+    x_std = X.std(axis=0, ddof=1)
+    y_std = Y.std(axis=0, ddof=1)
+    x_std[x_std == 0.0] = 1.0
+    y_std[y_std == 0.0] = 1.0
+    X /= x_std
+    Y /= y_std
+    
+    n_features = X.shape[1]
+    R = np.zeros((n_features, n_components))
+    T = np.zeros((X.shape[0], n_components))
+    Q = np.zeros((Y.shape[1], n_components))
+    V = np.zeros((n_features, n_components))
+    
+    # 交叉协方差矩阵，每个成分后在已提取载荷张成的空间外做正交投影
+    S = X.T @ Y
+    for a in range(n_components):
+        r = np.linalg.svd(S, full_matrices=False)[0][:, 0]
+        t = X @ r
+        norm_t = np.linalg.norm(t)
+        t /= norm_t
+        r /= norm_t
+        p = X.T @ t
+        v = p - V[:, :a] @ (V[:, :a].T @ p)
+        v /= np.linalg.norm(v)
+        S -= np.outer(v, v @ S)
+        R[:, a] = r
+        T[:, a] = t
+        Q[:, a] = Y.T @ t
+        V[:, a] = v
+    
+    return R, T, Q
+
+def compute_vip_scores(X: np.ndarray, Y: np.ndarray, n_components: int = 10,
+                       method: str = 'nipals') -> np.ndarray:
     """
     使用PLS回归计算VIP分数（多输出Y）
     Args:
         X: 预处理后的光谱矩阵 (n_samples, n_features)
         Y: 标准化后的属性矩阵 (n_samples, n_targets)
         n_components: PLS成分数
+        method: 'nipals'（默认，sklearn PLSRegression）或'simpls'（NumPy实现的SIMPLS，更快，
+                但多输出时选出的波段与NIPALS不同，切换需重新训练并同步上位机文件）
     Returns:
         vip: 每个特征的VIP分数 (n_features,)
     """
     n_components = max(1, min(n_components, min(X.shape[0]-1, X.shape[1])))
-    pls = PLSRegression(n_components=n_components)
-    pls.fit(X, Y)
-
-    T = pls.x_scores_               # (n_samples, n_components)
-    W = pls.x_weights_              # (n_features, n_components)
-    Q = pls.y_loadings_             # (n_targets, n_components)
+    if method == 'simpls':
+        # W: (n_features, n_components)，T: (n_samples, n_components)，Q: (n_targets, n_components)
+        W, T, Q = _simpls(X, Y, n_components)
+    elif method == 'nipals':
+        pls = PLSRegression(n_components=n_components)
+        pls.fit(X.astype(np.float32, copy=False), Y)
+        
+        T = pls.x_scores_               # (n_samples, n_components)
+        W = pls.x_weights_              # (n_features, n_components)
+        Q = pls.y_loadings_             # (n_targets, n_components)
+    else:
+        raise ValueError(f"未知的PLS方法: {method}")
 
     # 每个成分的解释方差贡献（对Y）
     # 使用T的方差与Q的平方和来度量
@@ -231,55 +311,168 @@ def compute_vip_scores(X: np.ndarray, Y: np.ndarray, n_components: int = 10) ->
     ssy = ssy / (ssy_total + 1e-12)
 
     # 计算VIP
-    W_norm = W / (np.linalg.norm(W, axis=0, keepdims=True) + 1e-12)
-    vip = np.sqrt(X.shape[1] * np.sum((W_norm ** 2) * ssy[np.newaxis, :], axis=1))
+    W_norm = W / (np.linalg.norm(W, axis=0) + 1e-12)
+    vip = np.sqrt(X.shape[1] * ((W_norm * W_norm) @ ssy))
     return vip
 
-def select_features_vip(X: np.ndarray, Y: np.ndarray, top_k: int = 100, n_components: int = 10) -> np.ndarray:
+def select_features_vip(X: np.ndarray, Y: np.ndarray, top_k: int = 100, n_components: int = 10,
+                        method: str = 'nipals') -> np.ndarray:
     """
     计算VIP分数并选择前top_k特征的索引
     """
     top_k = min(top_k, X.shape[1])
-    vip = compute_vip_scores(X, Y, n_components=n_components)
+    vip = compute_vip_scores(X, Y, n_components=n_components, method=method)
     selected_idx = np.argsort(vip)[::-1][:top_k]
     selected_idx = np.sort(selected_idx)
     return selected_idx
 
+class DeviceBatchLoader:
+    """驻留在设备上的小批次迭代器：数据集一次性拷贝到设备，按索引切片取批次"""
+    
+    def __init__(self, X: torch.Tensor, y: torch.Tensor, batch_size: int, shuffle: bool = False,
+                 drop_last: bool = False):
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+    
+    def __len__(self):
+        if self.drop_last:
+            return self.X.shape[0] // self.batch_size
+        return (self.X.shape[0] + self.batch_size - 1) // self.batch_size
+    
+    def __iter__(self):
+        if self.shuffle:
+            # 每个epoch在设备上生成一次排列，再按批次大小切分为索引片段
+            # drop_last时丢弃末尾不完整批次，保持批次形状固定（利于torch.compile/CUDA Graph）
+            n = len(self) * self.batch_size if self.drop_last else self.X.shape[0]
+            for idx in torch.randperm(self.X.shape[0], device=self.X.device)[:n].split(self.batch_size):
+                yield self.X[idx], self.y[idx]
+        else:
+            yield from zip(self.X.split(self.batch_size), self.y.split(self.batch_size))
+
 def create_data_loaders(spectra: np.ndarray, properties: np.ndarray, 
-                       batch_size: int = 32, train_ratio: float = 0.8) -> Tuple[Data.DataLoader, Data.DataLoader]:
+                       batch_size: int = 256, train_ratio: float = 0.8,
+                       device: torch.device = None,
+                       drop_last: bool = False) -> Tuple[DeviceBatchLoader, DeviceBatchLoader]:
     """
-    创建数据加载器
+    创建数据加载器（数据集很小，整体放到训练设备上，避免每个批次的主机到设备拷贝）
     Args:
         spectra: 光谱数据
         properties: 属性数据
-        batch_size: 批次大小
+        batch_size: 批次大小（超过训练集大小时截断为训练集大小）
         train_ratio: 训练集比例
+        device: 数据所在设备，默认有CUDA时使用GPU
+        drop_last: 训练集是否丢弃末尾不完整批次（仅torch.compile需要固定批次形状时启用）
     Returns:
         (训练数据加载器, 验证数据加载器)
     """
-    # 转换为PyTorch张量
-    X = torch.FloatTensor(spectra)
-    y = torch.FloatTensor(properties)
+    if device is None:
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     
-    # 创建数据集
-    dataset = Data.TensorDataset(X, y)
+    # 零拷贝包装为float32张量（已是连续float32时不复制），再一次性移动到设备
+    X = torch.from_numpy(np.ascontiguousarray(spectra, dtype=np.float32)).to(device, non_blocking=True)
+    y = torch.from_numpy(np.ascontiguousarray(properties, dtype=np.float32)).to(device, non_blocking=True)
     
     # 分割训练集和验证集
-    train_size = int(train_ratio * len(dataset))
-    val_size = len(dataset) - train_size
-    train_dataset, val_dataset = Data.random_split(dataset, [train_size, val_size])
+    n_samples = X.shape[0]
+    train_size = int(train_ratio * n_samples)
+    # 使用独立的固定种子生成器在CPU上排列，保证CPU/GPU训练得到相同的划分，且不受其他随机数消耗影响
+    generator = torch.Generator().manual_seed(42)
+    perm = torch.randperm(n_samples, generator=generator).to(device)
+    train_idx, val_idx = perm[:train_size], perm[train_size:]
+    if train_size == 0:
+        raise ValueError(f"训练集为空（样本数 {n_samples}，train_ratio {train_ratio}）")
+    
+    # 批次不超过训练集大小，保证小数据集至少有一个完整批次
+    batch_size = min(batch_size, train_size)
+    # 末尾仅剩1个样本的批次无法在训练模式下通过BatchNorm，一并丢弃
+    drop_last = drop_last or train_size % batch_size == 1
     
     # 创建数据加载器
-    train_loader = Data.DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = Data.DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
+    train_loader = DeviceBatchLoader(X[train_idx], y[train_idx], batch_size, shuffle=True, drop_last=drop_last)
+    val_loader = DeviceBatchLoader(X[val_idx], y[val_idx], batch_size, shuffle=False)
     
-    print(f"训练集大小: {len(train_dataset)}")
-    print(f"验证集大小: {len(val_dataset)}")
+    print(f"训练集大小: {train_size}")
+    print(f"验证集大小: {n_samples - train_size}")
     
     return train_loader, val_loader
 
-def train_model(model: nn.Module, train_loader: Data.DataLoader, val_loader: Data.DataLoader, 
-                epochs: int = 100, learning_rate: float = 0.001) -> Tuple[List[float], List[float]]:
+def capture_eval_graph(model: nn.Module, batch_size: int, input_size: int,
+                       device: torch.device) -> Tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor]:
+    """
+    为固定形状的eval前向捕获CUDA Graph，验证时只需拷入输入并重放
+    - 图中引用的是参数/BN统计量的存储地址，优化器原地更新后重放即使用最新权重
+    Args:
+        model: 已在device上的模型
+        batch_size: 静态批次大小（不足一批的输入在前n行拷入，取前n行输出）
+        input_size: 输入特征数量
+        device: CUDA设备
+    Returns:
+        (CUDA Graph, 静态输入缓冲, 静态输出缓冲)
+    """
+    was_training = model.training
+    model.eval()
+    static_x = torch.zeros(batch_size, input_size, device=device)
+    # 在旁路流上预热，避免把惰性初始化捕获进图
+    side_stream = torch.cuda.Stream(device)
+    side_stream.wait_stream(torch.cuda.current_stream(device))
+    with torch.cuda.stream(side_stream), torch.no_grad():
+        for _ in range(3):
+            model(static_x)
+    torch.cuda.current_stream(device).wait_stream(side_stream)
+    
+    graph = torch.cuda.CUDAGraph()
+    with torch.no_grad(), torch.cuda.graph(graph):
+        static_out = model(static_x)
+    model.train(was_training)
+    return graph, static_x, static_out
+
+def replay_eval_graph(graph: torch.cuda.CUDAGraph, static_x: torch.Tensor, static_out: torch.Tensor,
+                      batch_x: torch.Tensor) -> torch.Tensor:
+    """
+    将一个批次拷入静态输入并重放CUDA Graph
+    - 末尾不完整批次只写入前n行，返回前n行输出（多余行为上一批的残留，不参与计算）
+    Returns:
+        静态输出缓冲的前n行视图（下次重放会被覆盖）
+    """
+    n = batch_x.shape[0]
+    static_x[:n].copy_(batch_x)
+    graph.replay()
+    return static_out[:n]
+
+def verify_eval_graph(model: nn.Module, val_loader: DeviceBatchLoader, graph: torch.cuda.CUDAGraph,
+                      static_x: torch.Tensor, static_out: torch.Tensor, criterion: nn.Module,
+                      tol: float = 1e-3) -> bool:
+    """
+    对比CUDA Graph重放与eager前向在整个验证集上的输出与损失（含末尾不完整批次）
+    Args:
+        model: 当前模型（eval模式下比较）
+        val_loader: 验证数据加载器
+        graph/static_x/static_out: capture_eval_graph的返回值
+        criterion: 损失函数
+        tol: 输出与损失的允许偏差（TF32下不同批次形状可能选用不同GEMM实现）
+    Returns:
+        一致时返回True
+    """
+    was_training = model.training
+    model.eval()
+    max_out_diff = 0.0
+    max_loss_diff = 0.0
+    with torch.no_grad():
+        for batch_x, batch_y in val_loader:
+            replayed = replay_eval_graph(graph, static_x, static_out, batch_x).clone()
+            eager = model(batch_x)
+            max_out_diff = max(max_out_diff, (replayed - eager).abs().max().item())
+            max_loss_diff = max(max_loss_diff, abs(criterion(replayed, batch_y).item() - criterion(eager, batch_y).item()))
+    model.train(was_training)
+    print(f"CUDA Graph验证：输出最大偏差 {max_out_diff:.3e}，批次损失最大偏差 {max_loss_diff:.3e}")
+    return max_out_diff <= tol and max_loss_diff <= tol
+
+def train_model(model: nn.Module, train_loader: DeviceBatchLoader, val_loader: DeviceBatchLoader, 
+                epochs: int = 100, learning_rate: float = 0.001,
+                patience: int = 20, scheduler_patience: int = 10) -> Tuple[List[float], List[float]]:
     """
     训练模型
     Args:
@@ -288,21 +481,54 @@ def train_model(model: nn.Module, train_loader: Data.DataLoader, val_loader: Dat
         val_loader: 验证数据加载器
         epochs: 训练轮数
         learning_rate: 学习率
+        patience: 早停耐心（验证损失连续未改善的epoch数）
+        scheduler_patience: ReduceLROnPlateau的耐心（epoch数）
     Returns:
         (训练损失列表, 验证损失列表)
     """
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    # 以数据所在设备为准，保证模型与已驻留设备的数据同处一处，循环内无需再做拷贝
+    device = train_loader.X.device
     model = model.to(device)
     
-    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate, weight_decay=1e-5)
+    # CUDA下启用cuDNN自动调优与FP16混合精度（AMP），CPU上两者均不生效；
+    # 仍以FP32运行的矩阵乘在Ampere及以上架构走TF32
+    use_amp = device.type == 'cuda'
+    torch.backends.cudnn.benchmark = True
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    scaler = torch.amp.GradScaler(device.type, enabled=use_amp)
+    
+    # CUDA下使用fused Adam（单个内核更新全部参数），CPU上退回foreach多张量实现
+    if device.type == 'cuda':
+        optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate, weight_decay=1e-5, fused=True)
+    else:
+        optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate, weight_decay=1e-5, foreach=True)
     criterion = nn.MSELoss()
-    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=10, factor=0.5)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=scheduler_patience, factor=0.5)
+    
+    if len(train_loader) == 0:
+        raise ValueError("训练数据加载器没有任何批次，请减小batch_size或关闭drop_last")
     
     train_losses = []
     val_losses = []
     best_val_loss = float('inf')
     patience_counter = 0
-    patience = 20
+    
+    # ENABLE_CUDA_GRAPH开启时，CUDA下为验证前向捕获CUDA Graph；
+    # torch.compile(reduce-overhead)包装的模型已自带图捕获
+    val_graph = None
+    if ENABLE_CUDA_GRAPH and device.type == 'cuda' and not hasattr(model, '_orig_mod'):
+        try:
+            val_graph, val_static_x, val_static_out = capture_eval_graph(
+                model, val_loader.batch_size, val_loader.X.shape[1], device)
+        except RuntimeError as e:
+            print(f"CUDA Graph捕获失败，验证使用eager前向: {e}")
+            val_graph = None
+    
+    # 最佳模型在后台线程写盘，训练循环不等待序列化与磁盘I/O
+    best_path = os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_best.pth')
+    saver = ThreadPoolExecutor(max_workers=1)
+    pending_save = None
     
     print(f"使用设备: {device}")
     print("开始训练...")
@@ -310,31 +536,40 @@ def train_model(model: nn.Module, train_loader: Data.DataLoader, val_loader: Dat
     for epoch in range(epochs):
         # 训练阶段
         model.train()
-        train_loss = 0.0
+        # 损失在设备端累加，每个epoch只同步一次，避免逐批次.item()造成的设备->主机同步
+        running_train = torch.zeros((), device=device)
         for batch_x, batch_y in train_loader:
-            batch_x, batch_y = batch_x.to(device), batch_y.to(device)
-            
-            optimizer.zero_grad()
-            outputs = model(batch_x)
-            loss = criterion(outputs, batch_y)
-            loss.backward()
-            optimizer.step()
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_amp):
+                outputs = model(batch_x)
+                loss = criterion(outputs, batch_y)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
             
-            train_loss += loss.item()
+            running_train += loss.detach()
         
-        train_loss /= len(train_loader)
+        train_loss = (running_train / len(train_loader)).item()
+        
+        # 第一个epoch训练后（参数与BN统计量已原地更新）校验图重放与eager一致，不一致则退回eager
+        if val_graph is not None and epoch == 0:
+            if not verify_eval_graph(model, val_loader, val_graph, val_static_x, val_static_out, criterion):
+                print("CUDA Graph重放结果与eager前向不一致，验证改用eager前向")
+                val_graph = None
         
         # 验证阶段
         model.eval()
-        val_loss = 0.0
+        running_val = torch.zeros((), device=device)
         with torch.no_grad():
             for batch_x, batch_y in val_loader:
-                batch_x, batch_y = batch_x.to(device), batch_y.to(device)
-                outputs = model(batch_x)
+                if val_graph is not None:
+                    outputs = replay_eval_graph(val_graph, val_static_x, val_static_out, batch_x)
+                else:
+                    outputs = model(batch_x)
                 loss = criterion(outputs, batch_y)
-                val_loss += loss.item()
+                running_val += loss
         
-        val_loss /= len(val_loader)
+        val_loss = (running_val / len(val_loader)).item()
         
         train_losses.append(train_loss)
         val_losses.append(val_loss)
@@ -345,8 +580,12 @@ def train_model(model: nn.Module, train_loader: Data.DataLoader, val_loader: Dat
         if val_loss < best_val_loss:
             best_val_loss = val_loss
             patience_counter = 0
-            # 保存最佳模型
-            torch.save(model.state_dict(), os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_best.pth'))
+            # 保存最佳模型（编译后的模型取回原始模块，保证权重键名不带_orig_mod前缀）
+            # 先拷贝出CPU快照，后续训练步原地更新参数不会影响正在写盘的数据
+            state = {k: v.detach().to('cpu', copy=True) for k, v in getattr(model, '_orig_mod', model).state_dict().items()}
+            if pending_save is not None:
+                pending_save.result()
+            pending_save = saver.submit(torch.save, state, best_path)
         else:
             patience_counter += 1
         
@@ -357,10 +596,35 @@ def train_model(model: nn.Module, train_loader: Data.DataLoader, val_loader: Dat
         if (epoch + 1) % 10 == 0:
             print(f'Epoch [{epoch+1}/{epochs}], Train Loss: {train_loss:.6f}, Val Loss: {val_loss:.6f}')
     
+    # 返回前确保最后一次保存已写完，调用方随后会加载最佳模型
+    if pending_save is not None:
+        pending_save.result()
+    saver.shutdown()
+    
     return train_losses, val_losses
 
-def evaluate_model(model: nn.Module, val_loader: Data.DataLoader, property_labels: List[str], 
-                   property_scaler: StandardScaler = None) -> None:
+def compute_regression_metrics(targets: np.ndarray, predictions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按列向量化计算各属性的MSE与R²（与sklearn的mean_squared_error/r2_score结果一致）
+    Args:
+        targets: 真实值 (样本数 x 属性数)
+        predictions: 预测值 (样本数 x 属性数)
+    Returns:
+        (各属性MSE, 各属性R²)
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    diff = np.subtract(targets, predictions, dtype=np.float64)
+    diff *= diff
+    ss_res = diff.sum(axis=0)
+    mse = ss_res / targets.shape[0]
+    ss_tot = ((targets - targets.mean(axis=0)) ** 2).sum(axis=0)
+    # 目标为常数列时按sklearn约定：完全拟合记1，否则记0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1.0 - ss_res / ss_tot, np.where(ss_res == 0, 1.0, 0.0))
+    return mse, r2
+
+def evaluate_model(model: nn.Module, val_loader: DeviceBatchLoader, property_labels: List[str], 
+                   property_scaler: StandardScaler = None, int8_model: nn.Module = None) -> None:
     """
     评估模型性能
     Args:
@@ -368,25 +632,27 @@ def evaluate_model(model: nn.Module, val_loader: Data.DataLoader, property_label
         val_loader: 验证数据加载器
         property_labels: 属性标签列表
         property_scaler: 属性数据标准化器（用于反标准化）
+        int8_model: 可选的INT8动态量化模型（CPU），提供时额外打印其与FP32的指标差异
     """
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    device = val_loader.X.device
     model = model.to(device)
     model.eval()
     
-    all_predictions = []
-    all_targets = []
+    # 推理无需GradScaler，CUDA支持时以BF16自动混合精度前向
+    use_bf16 = device.type == 'cuda' and torch.cuda.is_bf16_supported()
     
-    with torch.no_grad():
-        for batch_x, batch_y in val_loader:
-            batch_x, batch_y = batch_x.to(device), batch_y.to(device)
-            predictions = model(batch_x)
-            
-            all_predictions.append(predictions.cpu().numpy())
-            all_targets.append(batch_y.cpu().numpy())
+    # 预分配设备端输出缓冲，逐批写入对应切片，最后一次性拷回主机；
+    # 验证集按原顺序迭代，目标值直接取驻留的y，无需逐批收集
+    predictions = torch.empty(val_loader.y.shape, dtype=torch.float32, device=device)
+    offset = 0
+    with torch.no_grad(), torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_bf16):
+        for batch_x, _ in val_loader:
+            n = batch_x.shape[0]
+            predictions[offset:offset + n] = model(batch_x)
+            offset += n
     
-    # 合并所有预测结果
-    predictions = np.vstack(all_predictions)
-    targets = np.vstack(all_targets)
+    predictions = predictions.cpu().numpy()
+    targets = val_loader.y.cpu().numpy()
     
     # 反标准化到原始尺度
     if property_scaler is not None:
@@ -403,10 +669,9 @@ def evaluate_model(model: nn.Module, val_loader: Data.DataLoader, property_label
         
         # 使用反标准化后的数据计算评估指标
         print("\n模型性能评估（基于实际值）:")
-        for i, label in enumerate(property_labels):
-            mse = mean_squared_error(targets_original[:, i], predictions_original[:, i])
-            r2 = r2_score(targets_original[:, i], predictions_original[:, i])
-            print(f"{label}: MSE = {mse:.4f}, R² = {r2:.4f}")
+        mse, r2 = compute_regression_metrics(targets_original, predictions_original)
+        for label, label_mse, label_r2 in zip(property_labels, mse, r2):
+            print(f"{label}: MSE = {label_mse:.4f}, R² = {label_r2:.4f}")
     else:
         print("\n=== 预测结果（标准化数据）===")
         print("预测值:", predictions[:5])
@@ -414,10 +679,38 @@ def evaluate_model(model: nn.Module, val_loader: Data.DataLoader, property_label
         
         # 使用标准化后的数据计算评估指标
         print("\n模型性能评估（基于标准化数据）:")
-        for i, label in enumerate(property_labels):
-            mse = mean_squared_error(targets[:, i], predictions[:, i])
-            r2 = r2_score(targets[:, i], predictions[:, i])
-            print(f"{label}: MSE = {mse:.4f}, R² = {r2:.4f}")
+        mse, r2 = compute_regression_metrics(targets, predictions)
+        for label, label_mse, label_r2 in zip(property_labels, mse, r2):
+            print(f"{label}: MSE = {label_mse:.4f}, R² = {label_r2:.4f}")
+    
+    if int8_model is not None:
+        # 验证集按原顺序迭代，可直接整体送入模型与上面的目标逐行对齐。
+        # 上面的评估在CUDA下为BF16自动混合精度，且train_model打开了TF32，
+        # 对比基准需不开autocast、临时关闭TF32重新做一次真正的FP32前向，结束后恢复原设置
+        with torch.no_grad():
+            if device.type == 'cuda':
+                prev_matmul_tf32 = torch.backends.cuda.matmul.allow_tf32
+                prev_cudnn_tf32 = torch.backends.cudnn.allow_tf32
+                torch.backends.cuda.matmul.allow_tf32 = False
+                torch.backends.cudnn.allow_tf32 = False
+                try:
+                    fp32_predictions = model(val_loader.X).float().cpu().numpy()
+                finally:
+                    torch.backends.cuda.matmul.allow_tf32 = prev_matmul_tf32
+                    torch.backends.cudnn.allow_tf32 = prev_cudnn_tf32
+            else:
+                fp32_predictions = predictions
+            int8_predictions = int8_model(val_loader.X.cpu()).numpy()
+        if property_scaler is not None:
+            fp32_mse, fp32_r2 = compute_regression_metrics(targets_original, property_scaler.inverse_transform(fp32_predictions))
+            int8_mse, int8_r2 = compute_regression_metrics(targets_original, property_scaler.inverse_transform(int8_predictions))
+        else:
+            fp32_mse, fp32_r2 = compute_regression_metrics(targets, fp32_predictions)
+            int8_mse, int8_r2 = compute_regression_metrics(targets, int8_predictions)
+        print(f"\nINT8量化模型评估（与FP32差异），输出最大偏差（标准化）: {np.abs(int8_predictions - fp32_predictions).max():.6f}")
+        for label, label_mse, label_r2, base_mse, base_r2 in zip(property_labels, int8_mse, int8_r2, fp32_mse, fp32_r2):
+            print(f"{label}: MSE = {label_mse:.4f} ({label_mse - base_mse:+.4f}), "
+                  f"R² = {label_r2:.4f} ({label_r2 - base_r2:+.4f})")
 
 def plot_training_history(train_losses: List[float], val_losses: List[float], save_path: str = None):
     """绘制训练历史"""
@@ -446,8 +739,35 @@ def plot_training_history(train_losses: List[float], val_losses: List[float], sa
     plt.tight_layout()
     if save_path is None:
         save_path = os.path.join(ROOT_DIR, 'training_history.png')
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
-    plt.show()
+    plt.savefig(save_path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+def fuse_linear_bn(model: SpectrumPredictor) -> SpectrumPredictor:
+    """
+    推理导出前将相邻的(Linear, BatchNorm1d)融合为单个Linear，并去掉推理时为恒等映射的Dropout
+    - eval模式下BN等价于仿射变换，融合后结果不变；原模型不受影响
+    - 融合后网络仅剩Linear+ReLU，便于后端将ReLU并入GEMM尾处理
+    Args:
+        model: 训练好的模型
+    Returns:
+        融合后的模型副本（eval模式）
+    """
+    fused = copy.deepcopy(model).eval()
+    layers = list(fused.network)
+    fused_layers = []
+    i = 0
+    while i < len(layers):
+        if (isinstance(layers[i], nn.Linear) and i + 1 < len(layers)
+                and isinstance(layers[i + 1], nn.BatchNorm1d)):
+            fused_layers.append(fuse_linear_bn_eval(layers[i], layers[i + 1]))
+            i += 2
+        elif isinstance(layers[i], nn.Dropout):
+            i += 1
+        else:
+            fused_layers.append(layers[i])
+            i += 1
+    fused.network = nn.Sequential(*fused_layers)
+    return fused
 
 def convert_to_torchscript(model: nn.Module, input_size: int, save_path: str = None):
     """
@@ -459,46 +779,79 @@ def convert_to_torchscript(model: nn.Module, input_size: int, save_path: str = N
     """
     print("正在转换为TorchScript格式...")
     
-    # 确保模型在CPU上
+    # 确保模型在CPU上，并将BN融合进前一层Linear（若传入的是torch.compile包装的模型，先取回原始模块）
     device = torch.device('cpu')
-    model = model.to(device)
-    model.eval()
+    model = fuse_linear_bn(getattr(model, '_orig_mod', model).to(device))
+    
+    # 网络为纯Sequential MLP、无数据相关控制流，直接script一次导出即可
+    scripted_model = torch.jit.script(model.eval())
+    # 冻结：内联参数并做常量折叠
+    scripted_model = torch.jit.freeze(scripted_model)
+    if save_path is None:
+        save_path = os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model.jit')
+    scripted_model.save(save_path)
+    print(f"TorchScript模型已保存到: {save_path}")
     
-    # 创建示例输入（在CPU上）
+    # 验证转换后的模型
+    # 导出与训练批次大小无关，验证时使用单样本输入（上位机逐条推理）
     sample = torch.randn(1, input_size, device=device)
+    loaded_model = torch.jit.load(save_path, map_location='cpu')
+    test_output = loaded_model(sample)
+    print(f"模型验证成功，输出形状: {test_output.shape}")
+
+def quantize_model_int8(model: nn.Module) -> nn.Module:
+    """
+    对模型做INT8动态量化（面向CPU/边缘端推理）
+    - 先融合BN，使全部GEMM都是nn.Linear，再将Linear权重量化为int8，激活在运行时动态量化
+    Args:
+        model: 训练好的PyTorch模型
+    Returns:
+        CPU上的量化模型副本（eval模式），原模型不受影响
+    """
+    fused = fuse_linear_bn(getattr(model, '_orig_mod', model)).to('cpu')
+    return torch.ao.quantization.quantize_dynamic(fused, {nn.Linear}, dtype=torch.qint8)
+
+def convert_int8_to_torchscript(int8_model: nn.Module, input_size: int, save_path: str = None):
+    """
+    将INT8动态量化模型导出为TorchScript（可选产物，上位机默认仍加载FP32模型）
+    Args:
+        int8_model: quantize_model_int8得到的量化模型
+        input_size: 输入特征数量
+        save_path: 保存路径，默认model/example/spectrum_model_int8.jit
+    """
+    scripted_model = torch.jit.freeze(torch.jit.script(int8_model.eval()))
+    if save_path is None:
+        save_path = os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model_int8.jit')
+    scripted_model.save(save_path)
     
-    # 使用torch.jit.trace进行转换
+    loaded_model = torch.jit.load(save_path, map_location='cpu')
+    test_output = loaded_model(torch.randn(1, input_size))
+    print(f"INT8 TorchScript模型已保存到: {save_path}，输出形状: {test_output.shape}")
+
+def export_program(model: nn.Module, input_size: int, save_path: str = None):
+    """
+    使用torch.export导出与TorchScript并行的.pt2计算图（可选产物，上位机仍使用.jit）
+    - 批次维度导出为动态维度，可供AOTInductor/torch.compile离线编译后部署
+    Args:
+        model: 训练好的PyTorch模型
+        input_size: 输入特征数量
+        save_path: 保存路径，默认model/example/spectrum_model.pt2
+    """
+    if not hasattr(torch, 'export'):
+        print("当前PyTorch版本不支持torch.export，跳过.pt2导出")
+        return
+    model = fuse_linear_bn(getattr(model, '_orig_mod', model).to('cpu'))
+    sample = torch.randn(2, input_size)
     try:
-        traced_model = torch.jit.trace(model, sample)
-        if save_path is None:
-            save_path = os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model.jit')
-        traced_model.save(save_path)
-        print(f"TorchScript模型已保存到: {save_path}")
-        
-        # 验证转换后的模型
-        loaded_model = torch.jit.load(save_path, map_location='cpu')
-        test_output = loaded_model(sample)
-        print(f"模型验证成功，输出形状: {test_output.shape}")
-        
+        exported = torch.export.export(model, (sample,),
+                                       dynamic_shapes=({0: torch.export.Dim('batch')},))
     except Exception as e:
-        print(f"TorchScript转换失败: {e}")
-        print("尝试使用torch.jit.script...")
-        
-        # 如果tracing失败，尝试使用scripting
-        try:
-            scripted_model = torch.jit.script(model)
-            if save_path is None:
-                save_path = os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model.jit')
-            scripted_model.save(save_path)
-            print(f"TorchScript模型已保存到: {save_path}")
-            
-            # 验证转换后的模型
-            loaded_model = torch.jit.load(save_path, map_location='cpu')
-            test_output = loaded_model(sample)
-            print(f"模型验证成功，输出形状: {test_output.shape}")
-            
-        except Exception as e2:
-            print(f"TorchScript scripting也失败: {e2}")
+        print(f"torch.export导出失败，仅保留TorchScript模型: {e}")
+        return
+    if save_path is None:
+        save_path = os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model.pt2')
+    torch.export.save(exported, save_path)
+    print(f"torch.export模型已保存到: {save_path}")
 
 def save_model_info(input_size: int, output_size: int, property_labels: List[str], 
                    wavelength_labels: List[str], selected_feature_indices: List[int],
@@ -514,11 +867,79 @@ def save_model_info(input_size: int, output_size: int, property_labels: List[str
     
     if save_path is None:
         save_path = os.path.join(ROOT_DIR, 'model', 'example', 'model_info.json')
-    with open(save_path, 'w') as f:
-        json.dump(model_info, f, indent=2)
+    if orjson is not None:
+        with open(save_path, 'wb') as f:
+            f.write(orjson.dumps(model_info, option=orjson.OPT_INDENT_2))
+    else:
+        with open(save_path, 'w') as f:
+            json.dump(model_info, f, indent=2)
     
     print(f"模型信息已保存到: {save_path}")
 
+# SNV/VIP/PCA计算逻辑变化时递增，使旧缓存失效
+_FEATURE_CACHE_VERSION = 1
+
+def compute_features_cached(snv_spectra: np.ndarray, scaled_properties: np.ndarray,
+                            spectrum_file: str, property_file: str,
+                            top_k: int, pca_components: int,
+                            vip_components: int = 10, vip_method: str = 'nipals',
+                            cache_dir: str = None) -> Tuple[np.ndarray, np.ndarray, PCA]:
+    """
+    计算VIP特征选择与PCA降维结果，并按计算版本、输入CSV内容与参数缓存
+    - 缓存读写失败（损坏、目录只读等）时退化为直接计算，不影响训练
+    Args:
+        snv_spectra: SNV后的光谱数据
+        scaled_properties: 标准化后的属性数据
+        spectrum_file: 光谱CSV路径（参与缓存键计算）
+        property_file: 属性CSV路径（参与缓存键计算）
+        top_k: VIP选择的特征数
+        pca_components: PCA主成分数
+        vip_components: VIP计算所用的PLS成分数
+        vip_method: VIP计算方法（'nipals'或'simpls'）
+        cache_dir: 缓存目录，默认model/example
+    Returns:
+        (选中特征索引, PCA后的特征, 拟合好的PCA)
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(ROOT_DIR, 'model', 'example')
+    hasher = hashlib.sha256(f"v{_FEATURE_CACHE_VERSION}".encode())
+    for path in (spectrum_file, property_file):
+        with open(path, 'rb') as f:
+            hasher.update(f.read())
+    # 所有影响选择/降维结果的参数都参与缓存键，任一变化即重新计算
+    hasher.update(f"{top_k}_{pca_components}_{vip_components}_{vip_method}".encode())
+    cache_file = os.path.join(cache_dir, f"cache_{hasher.hexdigest()[:16]}.npz")
+    
+    if os.path.exists(cache_file):
+        try:
+            with np.load(cache_file) as cache:
+                selected_idx = cache['selected_idx']
+                snv_feat_pca = cache['snv_feat_pca']
+                # 由缓存的均值与主成分还原PCA，供save_preprocessing_params导出
+                pca = PCA(n_components=int(cache['pca_components'].shape[0]))
+                pca.mean_ = cache['pca_mean']
+                pca.components_ = cache['pca_components']
+                pca.n_components_ = pca.components_.shape[0]
+            print(f"使用VIP/PCA缓存: {cache_file}")
+            return selected_idx, snv_feat_pca, pca
+        except (OSError, KeyError, ValueError) as e:
+            print(f"VIP/PCA缓存无法读取，重新计算: {e}")
+    
+    # === VIP特征选择 ===
+    selected_idx = select_features_vip(snv_spectra, scaled_properties, top_k=top_k,
+                                       n_components=vip_components, method=vip_method)
+    
+    # === PCA降维（在VIP之后）===
+    pca = PCA(n_components=pca_components, svd_solver='randomized', random_state=42)
+    snv_feat_pca = pca.fit_transform(snv_spectra[:, selected_idx])
+    
+    try:
+        np.savez(cache_file, selected_idx=selected_idx, snv_feat_pca=snv_feat_pca,
+                 pca_mean=pca.mean_, pca_components=pca.components_)
+    except OSError as e:
+        print(f"VIP/PCA缓存写入失败，跳过缓存: {e}")
+    return selected_idx, snv_feat_pca, pca
+
 def main():
     """主函数"""
     print("=== 光谱预测模型训练程序（含SNV预处理）===")
@@ -544,26 +965,31 @@ def main():
     # 对属性数据进行标准化
     scaled_properties, property_scaler = apply_property_scaling(properties)
     
-    # === VIP特征选择 ===
+    # === VIP特征选择 + PCA降维（输入CSV与参数不变时直接读取缓存）===
     top_k = min(100, snv_spectra.shape[1])
-    selected_idx = select_features_vip(snv_spectra, scaled_properties, top_k=top_k, n_components=10)
+    pca_components = min(32, top_k)
+    selected_idx, snv_feat_pca, pca = compute_features_cached(
+        snv_spectra, scaled_properties, spectrum_file, property_file, top_k, pca_components)
     print(f"选中特征数: {len(selected_idx)}，示例索引: {selected_idx[:10]}")
 
-    # 根据选择的索引筛选训练数据
-    snv_feat = snv_spectra[:, selected_idx]
-
-    # === PCA降维（在VIP之后）===
-    pca_components = min(32, snv_feat.shape[1])
-    pca = PCA(n_components=pca_components)
-    snv_feat_pca = pca.fit_transform(snv_feat)
-
     # 保存预处理参数（包含PCA）
     save_preprocessing_params(snv_spectra, property_scaler, 
                              save_path=os.path.join(ROOT_DIR, 'model', 'example', 'preprocessing_params.json'),
                              pca=pca)
     
+    # 仅在CUDA计算能力>=7（Inductor/Triton要求）或CPU上编译；编译时训练集按固定批次形状迭代（drop_last）
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    use_compile = ENABLE_TORCH_COMPILE and hasattr(torch, 'compile') and (
+        device.type != 'cuda' or torch.cuda.get_device_capability(device)[0] >= 7)
+    
     # 创建数据加载器（使用PCA后的数据）
-    train_loader, val_loader = create_data_loaders(snv_feat_pca, scaled_properties, batch_size=16)
+    # 大批次使GEMM形状足以利用Tensor Core；Adam的学习率按平方根规则随实际批次（以16为基准）放大
+    train_loader, val_loader = create_data_loaders(snv_feat_pca, scaled_properties, batch_size=256,
+                                                   device=device, drop_last=use_compile)
+    learning_rate = 0.001 * math.sqrt(train_loader.batch_size / 16)
+    # 轮数与耐心仍以epoch计（与batch_size=16时相同）：最佳验证损失出现在前几个epoch，
+    # 按步数放大耐心只会在过拟合阶段多训练数百个epoch
+    epochs, patience, scheduler_patience = 200, 20, 10
     
     # 创建模型（使用PCA后的数据维度）
     input_size = snv_feat_pca.shape[1]
@@ -573,14 +999,24 @@ def main():
     model = SpectrumPredictor(input_size, hidden_sizes, output_size)
     print(f"模型参数数量: {sum(p.numel() for p in model.parameters()):,}")
     
+    # 训练时使用编译后的模型（与原模型共享参数），评估与导出仍使用未编译的原模型；整图捕获。
+    # dynamic=False：按实际出现的形状（训练批次、验证末批）分别特化，不退化为动态形状图
+    train_net = model
+    if use_compile:
+        train_net = torch.compile(model, mode='reduce-overhead', fullgraph=True, dynamic=False)
+    
     # 训练模型
-    train_losses, val_losses = train_model(model, train_loader, val_loader, epochs=200, learning_rate=0.001)
+    train_losses, val_losses = train_model(train_net, train_loader, val_loader, epochs=epochs, learning_rate=learning_rate,
+                                           patience=patience, scheduler_patience=scheduler_patience)
     
     # 加载最佳模型
     model.load_state_dict(torch.load(os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_best.pth')))
     
+    # INT8动态量化（CPU推理用），评估时一并对比其与FP32的精度差异
+    int8_model = quantize_model_int8(model)
+    
     # 评估模型（传递标准化器以进行反标准化）
-    evaluate_model(model, val_loader, property_labels, property_scaler)
+    evaluate_model(model, val_loader, property_labels, property_scaler, int8_model=int8_model)
     
     # 绘制训练历史
     plot_training_history(train_losses, val_losses, save_path=os.path.join(ROOT_DIR, 'training_history.png'))
@@ -591,6 +1027,8 @@ def main():
     
     # 转换为TorchScript格式
     convert_to_torchscript(model, input_size, os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model.jit'))
+    export_program(model, input_size, os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model.pt2'))
+    convert_int8_to_torchscript(int8_model, input_size, os.path.join(ROOT_DIR, 'model', 'example', 'spectrum_model_int8.jit'))
     
     # 保存模型信息（包含选中特征索引）
     save_model_info(input_size, output_size, property_labels, wavelength_labels, selected_idx.tolist(),
@@ -600,9 +1038,12 @@ def main():
     print("生成的文件:")
     print("- model/spectrum_model.pth (PyTorch模型权重)")
     print("- model/spectrum_model.jit (TorchScript模型)")
+    print("- model/spectrum_model.pt2 (torch.export计算图，可选)")
+    print("- model/spectrum_model_int8.jit (INT8动态量化TorchScript模型，可选)")
     print("- model/spectrum_best.pth (最佳模型权重)")
     print("- model/model_info.json (模型信息)")
     print("- model/example/preprocessing_params.json (预处理参数)")
+    print("- model/example/preprocessing_params_*.npy (SNV统计与PCA参数)")
     print("- training_history.png (训练历史图表)")
     print("\n注意：模型使用SNV预处理的光谱数据和标准化后的属性数据进行训练")
     print("上位机需要使用相同的预处理参数进行预测")
@@ -10,7 +10,8 @@
 
 导出文件：
 - model_info.json：记录input_size、output_size、property_labels、wavelength_labels、selected_feature_indices
-- preprocessing_params.json：记录SNV统计、StandardScaler参数、PCA均值与主成分
+- preprocessing_params.json：记录SNV统计、StandardScaler参数、PCA参数
+- preprocessing_params_pca_mean.npy / preprocessing_params_pca_components.npy：PCA均值与主成分（float32）
 - feature_scaler.pkl：SVR特征标准化器
 - Property2_model.pkl：训练好的SVR模型
 
@@ -21,16 +22,22 @@ import numpy as np
 import pandas as pd
 from sklearn.svm import SVR
 from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.cross_decomposition import PLSRegression
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import KFold
+from sklearn.metrics.pairwise import rbf_kernel
+import joblib
+from joblib import Parallel, delayed
 import matplotlib.pyplot as plt
 import os
 import json
-import pickle
 from typing import List, Tuple, Dict
 
+try:
+    import numba
+except ImportError:  # numba为可选依赖，缺失时VIP回退到纯NumPy实现
+    numba = None
+
 # 以仓库根目录为基准进行路径解析，保证脚本移动后输出位置不变
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
@@ -39,17 +46,15 @@ ROOT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
 # DISABLE_TRAINING_HISTORY=0 以启用
 DISABLE_TRAINING_HISTORY = os.environ.get("DISABLE_TRAINING_HISTORY", "1").lower() in ("1", "true", "yes")
 
-def load_data(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.ndarray, List[str], List[str]]:
+def _parse_data_files(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.ndarray, List[str], List[str]]:
     """
-    加载光谱和属性数据
+    解析光谱和属性CSV文件，返回清洗后的数据
     Args:
         spectrum_file: 光谱数据文件路径
         property_file: 属性数据文件路径
     Returns:
         (光谱数据, 属性数据, 波长标签, 属性标签)
     """
-    print("正在加载数据...")
-    
     # 加载光谱数据
     spec_df = pd.read_csv(spectrum_file, header=None)
     spec_data = spec_df.iloc[9:].values
@@ -59,7 +64,10 @@ def load_data(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.nd
     
     # 提取光谱数据（从第11行开始，跳过前2列，移除最后一列NaN）
     spectra = spec_data[1:, 2:].astype(float)
-    spectra = spectra[:, ~np.isnan(spectra).any(axis=0)]  # 移除包含NaN的列
+    
+    # 只扫描一次NaN，列掩码与行掩码复用同一布尔矩阵
+    nan_mask = np.isnan(spectra)
+    col_ok = ~nan_mask.any(axis=0)  # 移除包含NaN的列
     
     # 加载属性数据
     prop_df = pd.read_csv(property_file, header=None)
@@ -73,17 +81,68 @@ def load_data(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.nd
     
     # 确保光谱数据和属性数据的行数一致
     min_rows = min(spectra.shape[0], properties.shape[0])
-    spectra = spectra[:min_rows]
-    properties = properties[:min_rows]
     
     # 只移除光谱数据中包含NaN的行
-    valid_indices = ~np.isnan(spectra).any(axis=1)
-    spectra = spectra[valid_indices]
-    properties = properties[valid_indices]
+    row_ok = ~nan_mask[:min_rows, col_ok].any(axis=1)
+    spectra = spectra[:min_rows][row_ok][:, col_ok]
+    properties = properties[:min_rows][row_ok]
     
     # 对于属性数据，用0填充NaN值
     properties = np.nan_to_num(properties, nan=0.0)
     
+    # 降为float32，后续SNV/PCA/标准化处理的数据量减半
+    spectra = spectra.astype(np.float32, copy=False)
+    properties = properties.astype(np.float32, copy=False)
+    
+    return spectra, properties, wavelength_labels, property_labels
+
+# 数据解析逻辑变化时递增，使旧缓存失效
+_DATA_CACHE_VERSION = 1
+
+def load_data(spectrum_file: str, property_file: str,
+              cache_file: str = None) -> Tuple[np.ndarray, np.ndarray, List[str], List[str]]:
+    """
+    加载光谱和属性数据
+    - 清洗后的数据缓存到.npz文件，以解析版本及两个CSV的绝对路径、大小、修改时间为键，CSV未变化时跳过解析
+    - 缓存读写失败（损坏、目录只读等）时退化为直接解析，不影响训练
+    Args:
+        spectrum_file: 光谱数据文件路径
+        property_file: 属性数据文件路径
+        cache_file: 缓存文件路径，默认与光谱文件同目录的cache.npz
+    Returns:
+        (光谱数据, 属性数据, 波长标签, 属性标签)
+    """
+    print("正在加载数据...")
+    
+    if cache_file is None:
+        cache_file = os.path.join(os.path.dirname(spectrum_file), 'cache.npz')
+    key_parts = [f"v{_DATA_CACHE_VERSION}"]
+    for path in (spectrum_file, property_file):
+        stat = os.stat(path)
+        key_parts.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    key = "|".join(key_parts)
+    
+    cached = None
+    if os.path.exists(cache_file):
+        try:
+            with np.load(cache_file) as cache:
+                if str(cache['key']) == key:
+                    cached = (cache['spectra'], cache['properties'],
+                              cache['wl'].tolist(), cache['props'].tolist())
+        except (OSError, KeyError, ValueError) as e:
+            print(f"缓存文件无法读取，重新解析: {e}")
+    
+    if cached is not None:
+        print(f"使用缓存数据: {cache_file}")
+        spectra, properties, wavelength_labels, property_labels = cached
+    else:
+        spectra, properties, wavelength_labels, property_labels = _parse_data_files(spectrum_file, property_file)
+        try:
+            np.savez_compressed(cache_file, spectra=spectra, properties=properties,
+                                wl=np.array(wavelength_labels), props=np.array(property_labels), key=key)
+        except OSError as e:
+            print(f"缓存写入失败，跳过缓存: {e}")
+    
     print(f"光谱数据形状: {spectra.shape}")
     print(f"属性数据形状: {properties.shape}")
     print(f"波长数量: {len(wavelength_labels)}")
@@ -91,6 +150,28 @@ def load_data(spectrum_file: str, property_file: str) -> Tuple[np.ndarray, np.nd
     
     return spectra, properties, wavelength_labels, property_labels
 
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _snv_kernel(spectra, out):
+        """按样本并行的SNV核：每行在缓存中完成均值、标准差与标准化"""
+        n, p = spectra.shape
+        for i in numba.prange(n):
+            m = 0.0
+            for j in range(p):
+                m += spectra[i, j]
+            m /= p
+            s = 0.0
+            for j in range(p):
+                d = spectra[i, j] - m
+                s += d * d
+            s = np.sqrt(s / p)
+            # 标准差过小的样本只做去均值
+            inv = 1.0 / s if s > 1e-8 else 1.0
+            for j in range(p):
+                out[i, j] = (spectra[i, j] - m) * inv
+else:
+    _snv_kernel = None
+
 def apply_snv(spectra: np.ndarray) -> np.ndarray:
     """
     对光谱数据应用SNV (Standard Normal Variate) 标准化
@@ -103,19 +184,19 @@ def apply_snv(spectra: np.ndarray) -> np.ndarray:
     
     # SNV标准化：对每个样本进行标准化
     # 公式: (x - mean(x)) / std(x)
-    snv_spectra = np.zeros_like(spectra)
+    if _snv_kernel is not None:
+        snv_spectra = np.empty(spectra.shape, dtype=np.float32)
+        _snv_kernel(np.ascontiguousarray(spectra), snv_spectra)
+        print(f"SNV标准化完成，数据形状: {snv_spectra.shape}")
+        return snv_spectra
     
-    for i in range(spectra.shape[0]):
-        sample = spectra[i, :]
-        # 计算均值和标准差
-        mean_val = np.mean(sample)
-        std_val = np.std(sample)
-        
-        # 避免除零错误
-        if std_val > 1e-8:
-            snv_spectra[i, :] = (sample - mean_val) / std_val
-        else:
-            snv_spectra[i, :] = sample - mean_val
+    # 无numba时按行广播：先复制为连续float32缓冲区，之后原地去均值、除标准差，减少内存读写
+    snv_spectra = np.array(spectra, dtype=np.float32, order='C', copy=True)
+    np.subtract(snv_spectra, snv_spectra.mean(axis=1, keepdims=True), out=snv_spectra)
+    
+    # 避免除零错误：标准差过小的样本只做去均值
+    std_val = snv_spectra.std(axis=1, keepdims=True)
+    np.divide(snv_spectra, np.where(std_val > 1e-8, std_val, 1.0), out=snv_spectra)
     
     print(f"SNV标准化完成，数据形状: {snv_spectra.shape}")
     return snv_spectra
@@ -142,7 +223,7 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     """
     保存预处理参数供上位机使用
     - 目的：保证上位机复现训练时的同一处理链
-    - 写入：SNV统计（mean/std）、属性StandardScaler（mean/scale）、可选PCA（mean/components/n_components）
+    - 写入：SNV统计（mean/std）、属性StandardScaler（mean/scale）、可选PCA（mean/components以.npy旁存，n_components）
     Args:
         snv_spectra: SNV标准化后的光谱数据（用于计算统计信息）
         property_scaler: 属性数据标准化器
@@ -152,8 +233,12 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     print("正在保存预处理参数...")
     
     # 计算光谱数据的统计信息（用于验证）
-    spectrum_mean = np.mean(snv_spectra, axis=0)
-    spectrum_std = np.std(snv_spectra, axis=0)
+    # 由一阶/二阶矩求均值与标准差，float64累加避免E[x²]-E[x]²的精度损失
+    n = snv_spectra.shape[0]
+    s1 = snv_spectra.sum(axis=0, dtype=np.float64)
+    s2 = np.einsum('ij,ij->j', snv_spectra, snv_spectra, dtype=np.float64)
+    spectrum_mean = s1 / n
+    spectrum_std = np.sqrt(np.maximum(s2 / n - spectrum_mean * spectrum_mean, 0.0))
     
     preprocessing_params = {
         'spectrum_stats': {
@@ -170,9 +255,17 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     if pca is not None:
         # components_形状：(n_components, n_features_after_VIP)
         # 上位机将以mean_长度作为期望特征数，先对VIP后的特征对齐，再执行投影
+        # 大矩阵以float32 .npy二进制文件旁存，JSON中只记录相对文件名
+        components_path = save_path.replace('.json', '_pca_components.npy')
+        mean_path = save_path.replace('.json', '_pca_mean.npy')
+        # 上位机loadNpyFloat32只接受C顺序数组，components_可能为Fortran顺序，需显式转为连续C顺序
+        np.save(components_path, np.ascontiguousarray(pca.components_, dtype=np.float32))
+        np.save(mean_path, np.ascontiguousarray(pca.mean_, dtype=np.float32))
         preprocessing_params['pca'] = {
-            'mean': pca.mean_.tolist(),
-            'components': pca.components_.tolist(),
+            'components_file': os.path.basename(components_path),
+            'mean_file': os.path.basename(mean_path),
+            'dtype': 'float32',
+            'shape': list(pca.components_.shape),
             'n_components': int(pca.n_components_)
         }
     
@@ -181,23 +274,122 @@ def save_preprocessing_params(snv_spectra: np.ndarray, property_scaler: Standard
     
     print(f"预处理参数已保存到: {save_path}")
 
-def compute_vip_scores(X: np.ndarray, Y: np.ndarray, n_components: int = 10) -> np.ndarray:
+def _vip_kernel_py(W: np.ndarray, col_norm2: np.ndarray, ssy: np.ndarray, p: int) -> np.ndarray:
+    """
+    VIP核心计算：按列归一化W、按成分贡献加权并开方，单次遍历W完成
+    Args:
+        W: PLS的X权重 (n_features, n_components)
+        col_norm2: W各列范数的平方 (n_components,)
+        ssy: 归一化后的各成分解释贡献 (n_components,)
+        p: 特征数
+    Returns:
+        vip: 每个特征的VIP分数 (n_features,)
+    """
+    n_features, n_comp = W.shape
+    vip = np.empty(n_features)
+    for j in range(n_features):
+        acc = 0.0
+        for k in range(n_comp):
+            acc += (W[j, k] * W[j, k] / col_norm2[k]) * ssy[k]
+        vip[j] = np.sqrt(p * acc)
+    return vip
+
+if numba is not None:
+    _vip_kernel = numba.njit(cache=True, fastmath=True)(_vip_kernel_py)
+else:
+    _vip_kernel = None
+
+def _nipals_pls(X: np.ndarray, Y: np.ndarray, n_components: int,
+                max_iter: int = 500, tol: float = 1e-6,
+                min_gain: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    轻量NIPALS PLS（与PLSRegression(scale=True)一致），只返回VIP所需的矩阵
+    Args:
+        X: 特征矩阵 (n_samples, n_features)
+        Y: 目标矩阵 (n_samples, n_targets)
+        n_components: PLS成分数（上限）
+        max_iter: 每个成分的幂迭代最大次数
+        tol: 权重收敛阈值
+        min_gain: 某成分解释的Y方差占比低于该值时提前停止（0表示始终提取n_components个）
+    Returns:
+        (W, T, Q)：X权重 (n_features, c)、X得分 (n_samples, c)、Y载荷 (n_targets, c)
+    """
+    eps = np.finfo(np.float64).eps
+    
+    # 中心化并按样本标准差缩放（零方差列缩放因子取1）
+    Xk = np.array(X, dtype=np.float64)
+    Yk = np.array(Y, dtype=np.float64)
+    Xk -= Xk.mean(axis=0)
+    Yk -= Yk.mean(axis=0)
+    x_std = Xk.std(axis=0, ddof=1)
+    y_std = Yk.std(axis=0, ddof=1)
+    x_std[x_std == 0.0] = 1.0
+    y_std[y_std == 0.0] = 1.0
+    Xk /= x_std
+    Yk /= y_std
+    
+    n_samples, n_features = Xk.shape
+    ssy_total = np.sum(Yk * Yk)
+    W = np.zeros((n_features, n_components))
+    T = np.zeros((n_samples, n_components))
+    Q = np.zeros((Yk.shape[1], n_components))
+    
+    for k in range(n_components):
+        # Y残差已为常数时无法继续提取成分
+        y_cols = np.flatnonzero(np.any(np.abs(Yk) > 10 * eps, axis=0))
+        if y_cols.size == 0:
+            W, T, Q = W[:, :k], T[:, :k], Q[:, :k]
+            break
+        
+        # 幂迭代求第一对奇异向量
+        u = Yk[:, y_cols[0]].copy()
+        w_old = np.zeros(n_features)
+        for _ in range(max_iter):
+            w = Xk.T @ u / (u @ u)
+            w /= np.sqrt(w @ w) + eps
+            t = Xk @ w
+            c = Yk.T @ t / (t @ t)
+            u = Yk @ c / (c @ c + eps)
+            if np.dot(w - w_old, w - w_old) < tol or Yk.shape[1] == 1:
+                break
+            w_old = w
+        
+        # 对X和Y做回归式紧缩
+        t = Xk @ w
+        tt = t @ t
+        p = Xk.T @ t / tt
+        q = Yk.T @ t / tt
+        Xk -= np.outer(t, p)
+        Yk -= np.outer(t, q)
+        
+        W[:, k] = w
+        T[:, k] = t
+        Q[:, k] = q
+        
+        # 该成分解释的Y方差占比（t't * q'q / ||Y||²）过小则提前停止，且不保留该成分
+        # （至少保留第一个成分，保证VIP有定义）
+        if tt * (q @ q) < min_gain * ssy_total:
+            keep = max(k, 1)
+            W, T, Q = W[:, :keep], T[:, :keep], Q[:, :keep]
+            break
+    
+    return W, T, Q
+
+def compute_vip_scores(X: np.ndarray, Y: np.ndarray, n_components: int = 10,
+                       min_gain: float = 1e-3) -> np.ndarray:
     """
-    使用PLS回归计算VIP分数（多输出Y）
+    使用PLS（NIPALS）计算VIP分数（多输出Y）
     Args:
         X: 预处理后的光谱矩阵 (n_samples, n_features)
         Y: 标准化后的属性矩阵 (n_samples, n_targets)
-        n_components: PLS成分数
+        n_components: PLS成分数（上限）
+        min_gain: 新成分解释的Y方差占比低于该值时停止提取
     Returns:
         vip: 每个特征的VIP分数 (n_features,)
     """
     n_components = max(1, min(n_components, min(X.shape[0]-1, X.shape[1])))
-    pls = PLSRegression(n_components=n_components)
-    pls.fit(X, Y)
-
-    T = pls.x_scores_               # (n_samples, n_components)
-    W = pls.x_weights_              # (n_features, n_components)
-    Q = pls.y_loadings_             # (n_targets, n_components)
+    # W: (n_features, n_components)，T: (n_samples, n_components)，Q: (n_targets, n_components)
+    W, T, Q = _nipals_pls(X, Y, n_components, min_gain=min_gain)
 
     # 每个成分的解释方差贡献（对Y）
     # 使用T的方差与Q的平方和来度量
@@ -206,8 +398,14 @@ def compute_vip_scores(X: np.ndarray, Y: np.ndarray, n_components: int = 10) ->
     ssy = ssy / (ssy_total + 1e-12)
 
     # 计算VIP
-    W_norm = W / (np.linalg.norm(W, axis=0, keepdims=True) + 1e-12)
-    vip = np.sqrt(X.shape[1] * np.sum((W_norm ** 2) * ssy[np.newaxis, :], axis=1))
+    col_norm = np.linalg.norm(W, axis=0) + 1e-12
+    if _vip_kernel is not None:
+        # 归一化、加权与开方融合在一个JIT核内完成
+        W = np.ascontiguousarray(W, dtype=np.float64)
+        col_norm2 = np.ascontiguousarray(col_norm * col_norm, dtype=np.float64)
+        return _vip_kernel(W, col_norm2, np.ascontiguousarray(ssy, dtype=np.float64), X.shape[1])
+    W_norm = W / col_norm
+    vip = np.sqrt(X.shape[1] * ((W_norm * W_norm) @ ssy))
     return vip
 
 def select_features_vip(X: np.ndarray, Y: np.ndarray, top_k: int = 100, n_components: int = 10) -> np.ndarray:
@@ -216,10 +414,79 @@ def select_features_vip(X: np.ndarray, Y: np.ndarray, top_k: int = 100, n_compon
     """
     top_k = min(top_k, X.shape[1])
     vip = compute_vip_scores(X, Y, n_components=n_components)
-    selected_idx = np.argsort(vip)[::-1][:top_k]
+    # argpartition以O(p)选出前top_k，再对少量结果排序
+    selected_idx = np.argpartition(vip, -top_k)[-top_k:]
     selected_idx = np.sort(selected_idx)
     return selected_idx
 
+def _search_one_target(y: np.ndarray, fold_kernels: list, C_list: list,
+                       epsilon_list: list) -> Tuple[float, float, float]:
+    """
+    在给定核矩阵上为单个属性搜索C与epsilon
+    Returns:
+        (最佳交叉验证MSE, 最佳C, 最佳epsilon)
+    """
+    best = (np.inf, None, None)
+    for C in C_list:
+        for epsilon in epsilon_list:
+            mse = 0.0
+            for K_tr, K_va, tr, va in fold_kernels:
+                svr = SVR(kernel='precomputed', C=C, epsilon=epsilon)
+                svr.fit(K_tr, y[tr])
+                mse += mean_squared_error(y[va], svr.predict(K_va))
+            mse /= len(fold_kernels)
+            if mse < best[0]:
+                best = (mse, C, epsilon)
+    return best
+
+def search_svr_params(X: np.ndarray, Y: np.ndarray, param_grid: Dict[str, list],
+                      cv: int = 3, n_jobs: int = -1) -> Tuple[List[Dict[str, float]], np.ndarray]:
+    """
+    使用预计算RBF核矩阵为所有属性联合搜索SVR超参数
+    - 每个gamma只计算一次核矩阵，所有属性、C、epsilon及各折共享
+    Args:
+        X: 训练特征数据 (n_samples, n_features)
+        Y: 训练标签数据 (n_samples, n_targets)
+        param_grid: 参数网格，包含'C'、'gamma'、'epsilon'（gamma可含'scale'/'auto'）
+        cv: 交叉验证折数
+        n_jobs: 按属性并行的任务数（-1表示使用全部CPU核）
+    Returns:
+        (每个属性的最佳参数列表, 每个属性的最佳交叉验证MSE)
+    """
+    n_targets = Y.shape[1]
+    folds = list(KFold(n_splits=cv).split(X))
+    
+    # 将'scale'/'auto'解析为数值gamma，与SVR内部定义一致
+    gammas = []
+    for g in param_grid['gamma']:
+        if g == 'scale':
+            g = 1.0 / (X.shape[1] * X.var())
+        elif g == 'auto':
+            g = 1.0 / X.shape[1]
+        gammas.append(float(g))
+    
+    best_params = [None] * n_targets
+    best_mse = np.full(n_targets, np.inf)
+    
+    for gamma in gammas:
+        # 外层：每个gamma预计算一次完整核矩阵，各折直接切片
+        # libsvm内部以float64计算，这里一次性转换，避免每次fit重复转换
+        K = rbf_kernel(X, X, gamma=gamma).astype(np.float64, copy=False)
+        fold_kernels = [(K[np.ix_(tr, tr)], K[np.ix_(va, tr)], tr, va) for tr, va in folds]
+        
+        # 内层：各属性并行搜索 C x epsilon，复用缓存的核矩阵
+        # libsvm训练期间释放GIL，使用线程后端避免复制核矩阵
+        results = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(_search_one_target)(Y[:, t], fold_kernels, param_grid['C'], param_grid['epsilon'])
+            for t in range(n_targets)
+        )
+        for t, (mse, C, epsilon) in enumerate(results):
+            if mse < best_mse[t]:
+                best_mse[t] = mse
+                best_params[t] = {'C': C, 'gamma': gamma, 'epsilon': epsilon}
+    
+    return best_params, best_mse
+
 def train_svr_models(X_train: np.ndarray, y_train: np.ndarray, 
                     X_val: np.ndarray, y_val: np.ndarray,
                     property_labels: List[str]) -> List[SVR]:
@@ -236,6 +503,16 @@ def train_svr_models(X_train: np.ndarray, y_train: np.ndarray,
     """
     print("正在训练SVR模型...")
     
+    # 定义SVR参数网格（特征已标准化，gamma直接取对数网格，不再重复'scale'/'auto'）
+    param_grid = {
+        'C': [1, 10, 100],
+        'gamma': np.logspace(-3, 1, 5).tolist(),
+        'epsilon': [0.05, 0.1, 0.2]
+    }
+    
+    # 所有属性共享核矩阵进行超参数搜索
+    best_params, _ = search_svr_params(X_train, y_train, param_grid, cv=3)
+    
     # 为每个属性训练一个SVR模型
     svr_models = []
     
@@ -246,31 +523,9 @@ def train_svr_models(X_train: np.ndarray, y_train: np.ndarray,
         y_train_prop = y_train[:, i]
         y_val_prop = y_val[:, i]
         
-        # 定义SVR参数网格
-        param_grid = {
-            'C': [0.1, 1, 10, 100],
-            'gamma': ['scale', 'auto', 0.001, 0.01, 0.1, 1],
-            'epsilon': [0.01, 0.1, 0.2, 0.5]
-        }
-        
-        # 创建SVR模型
-        svr = SVR(kernel='rbf')
-        
-        # 使用网格搜索进行超参数优化
-        grid_search = GridSearchCV(
-            svr, 
-            param_grid, 
-            cv=3, 
-            scoring='neg_mean_squared_error',
-            n_jobs=-1,
-            verbose=0
-        )
-        
-        # 训练模型
-        grid_search.fit(X_train, y_train_prop)
-        
-        # 获取最佳模型
-        best_svr = grid_search.best_estimator_
+        # 使用最佳参数在完整训练集上重新训练（RBF核，保证predict可直接使用原始特征）
+        best_svr = SVR(kernel='rbf', **best_params[i])
+        best_svr.fit(X_train, y_train_prop)
         svr_models.append(best_svr)
         
         # 评估模型
@@ -279,7 +534,7 @@ def train_svr_models(X_train: np.ndarray, y_train: np.ndarray,
         r2 = r2_score(y_val_prop, y_pred)
         
         print(f"  {label}: MSE = {mse:.4f}, R² = {r2:.4f}")
-        print(f"  最佳参数: {grid_search.best_params_}")
+        print(f"  最佳参数: {best_params[i]}")
     
     return svr_models
 
@@ -296,24 +551,20 @@ def evaluate_svr_models(svr_models: List[SVR], X_val: np.ndarray, y_val: np.ndar
     """
     print("\n=== SVR模型性能评估 ===")
     
-    all_predictions = []
-    all_targets = []
+    # 预测：各属性的预测结果直接写入预分配的 (n_val, n_targets) 数组
+    predictions = np.empty((X_val.shape[0], len(svr_models)), dtype=np.float32)
+    for i, svr_model in enumerate(svr_models):
+        predictions[:, i] = svr_model.predict(X_val)
     
-    for i, (svr_model, label) in enumerate(zip(svr_models, property_labels)):
-        # 预测
-        y_pred = svr_model.predict(X_val)
-        all_predictions.append(y_pred)
-        all_targets.append(y_val[:, i])
-        
-        # 计算评估指标
-        mse = mean_squared_error(y_val[:, i], y_pred)
-        r2 = r2_score(y_val[:, i], y_pred)
-        
-        print(f"{label}: MSE = {mse:.4f}, R² = {r2:.4f}")
+    # 计算评估指标（一次性计算所有属性）
+    mse = mean_squared_error(y_val, predictions, multioutput='raw_values')
+    r2 = r2_score(y_val, predictions, multioutput='raw_values')
+    for label, m, r in zip(property_labels, mse, r2):
+        print(f"{label}: MSE = {m:.4f}, R² = {r:.4f}")
     
     # 反标准化到原始尺度
     if property_scaler is not None:
-        predictions_original = property_scaler.inverse_transform(np.array(all_predictions).T)
+        predictions_original = property_scaler.inverse_transform(predictions)
         targets_original = property_scaler.inverse_transform(y_val)
         
         print("\n=== 反标准化后的预测结果（实际值）===")
@@ -322,10 +573,10 @@ def evaluate_svr_models(svr_models: List[SVR], X_val: np.ndarray, y_val: np.ndar
         
         # 使用反标准化后的数据计算评估指标
         print("\n模型性能评估（基于实际值）:")
-        for i, label in enumerate(property_labels):
-            mse = mean_squared_error(targets_original[:, i], predictions_original[:, i])
-            r2 = r2_score(targets_original[:, i], predictions_original[:, i])
-            print(f"{label}: MSE = {mse:.4f}, R² = {r2:.4f}")
+        mse = mean_squared_error(targets_original, predictions_original, multioutput='raw_values')
+        r2 = r2_score(targets_original, predictions_original, multioutput='raw_values')
+        for label, m, r in zip(property_labels, mse, r2):
+            print(f"{label}: MSE = {m:.4f}, R² = {r:.4f}")
 
 def save_svr_models(svr_models: List[SVR], feature_scaler: StandardScaler, 
                    save_dir: str = 'model/svr'):
@@ -344,14 +595,12 @@ def save_svr_models(svr_models: List[SVR], feature_scaler: StandardScaler,
     
     # 保存SVR模型
     model_path = os.path.join(save_dir, 'Property2_model.pkl')
-    with open(model_path, 'wb') as f:
-        pickle.dump(svr_models, f)
+    joblib.dump(svr_models, model_path, compress=3, protocol=5)
     print(f"SVR模型已保存到: {model_path}")
     
     # 保存特征标准化器
     scaler_path = os.path.join(save_dir, 'feature_scaler.pkl')
-    with open(scaler_path, 'wb') as f:
-        pickle.dump(feature_scaler, f)
+    joblib.dump(feature_scaler, scaler_path, compress=3, protocol=5)
     print(f"特征标准化器已保存到: {scaler_path}")
 
 def save_model_info(input_size: int, output_size: int, property_labels: List[str], 
@@ -409,7 +658,7 @@ def main():
 
     # === PCA降维（在VIP之后）===
     pca_components = min(32, snv_feat.shape[1])
-    pca = PCA(n_components=pca_components)
+    pca = PCA(n_components=pca_components, svd_solver='randomized', random_state=42, copy=False)
     snv_feat_pca = pca.fit_transform(snv_feat)
 
     # 保存预处理参数（包含PCA）
@@ -461,6 +710,7 @@ def main():
     print("- model/svr/feature_scaler.pkl (特征标准化器)")
     print("- model/svr/model_info.json (模型信息)")
     print("- model/svr/preprocessing_params.json (预处理参数)")
+    print("- model/svr/preprocessing_params_pca_*.npy (PCA均值与主成分)")
     print("\n注意：模型使用SNV预处理的光谱数据和标准化后的属性数据进行训练")
     print("上位机需要使用相同的预处理参数进行预测")
 
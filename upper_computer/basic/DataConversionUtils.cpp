@@ -1,4 +1,8 @@
 #include "DataConversionUtils.h"
+#include <QDebug>
+#include <QFile>
+#include <QRegularExpression>
+#include <cstring>
 
 namespace upper_computer {
 namespace basic {
@@ -77,5 +81,62 @@ std::vector<std::vector<float>> DataConversionUtils::qVector2DToStdVector2D(cons
     return result;
 }
 
+bool DataConversionUtils::loadNpyFloat32(const QString& path, std::vector<int>& shape, std::vector<float>& values)
+{
+    QFile file(path);
+    if (!file.open(QIODevice::ReadOnly)) {
+        qDebug() << "无法打开NPY文件:" << path;
+        return false;
+    }
+    QByteArray data = file.readAll();
+    file.close();
+    
+    // 头部：\x93NUMPY + 主版本 + 次版本 + 头长度(v1为2字节，v2/v3为4字节，小端)
+    if (data.size() < 10 || !data.startsWith("\x93NUMPY")) {
+        qDebug() << "NPY文件格式无效:" << path;
+        return false;
+    }
+    const int major = static_cast<unsigned char>(data[6]);
+    int headerStart = 0;
+    quint32 headerLen = 0;
+    if (major == 1) {
+        headerLen = static_cast<unsigned char>(data[8]) | (static_cast<unsigned char>(data[9]) << 8);
+        headerStart = 10;
+    } else {
+        if (data.size() < 12) return false;
+        for (int i = 0; i < 4; ++i) {
+            headerLen |= static_cast<quint32>(static_cast<unsigned char>(data[8 + i])) << (8 * i);
+        }
+        headerStart = 12;
+    }
+    const QString header = QString::fromLatin1(data.mid(headerStart, static_cast<int>(headerLen)));
+    if (!header.contains("'descr': '<f4'") || !header.contains("'fortran_order': False")) {
+        qDebug() << "NPY文件需为float32且C顺序:" << path;
+        return false;
+    }
+    
+    QRegularExpressionMatch m = QRegularExpression("'shape': \\(([^)]*)\\)").match(header);
+    if (!m.hasMatch()) {
+        qDebug() << "NPY文件缺少shape:" << path;
+        return false;
+    }
+    shape.clear();
+    qint64 count = 1;
+    for (const QString& dim : m.captured(1).split(',')) {
+        if (dim.trimmed().isEmpty()) continue;  // 一维数组形如 (n,)
+        shape.push_back(dim.trimmed().toInt());
+        count *= shape.back();
+    }
+    
+    const qint64 offset = headerStart + headerLen;
+    if (data.size() < offset + count * static_cast<qint64>(sizeof(float))) {
+        qDebug() << "NPY文件数据长度不足:" << path;
+        return false;
+    }
+    values.resize(static_cast<size_t>(count));
+    std::memcpy(values.data(), data.constData() + offset, static_cast<size_t>(count) * sizeof(float));
+    return true;
+}
+
 } // namespace basic
 } // namespace upper_computer
@@ -1,6 +1,7 @@
 #pragma once
 #include <QJsonArray>
 #include <QJsonValue>
+#include <QString>
 #include <QVector>
 #include <vector>
 
@@ -56,6 +57,15 @@ public:
      * @return 二维std::vector
      */
     static std::vector<std::vector<float>> qVector2DToStdVector2D(const QVector<QVector<double>>& qvec2d);
+    
+    /**
+     * @brief 读取float32、C顺序的.npy文件（训练脚本np.save导出的参数）
+     * @param path .npy文件路径
+     * @param shape 输出：数组形状
+     * @param values 输出：按行展开的数据
+     * @return 是否读取成功
+     */
+    static bool loadNpyFloat32(const QString& path, std::vector<int>& shape, std::vector<float>& values);
 };
 
 } // namespace basic
@@ -27,6 +27,25 @@ std::vector<float> applyPcaProject(const std::vector<float>& features,
     return projected;
 }
 
+std::vector<float> applyAffineProject(const std::vector<float>& features,
+                                      const std::vector<std::vector<float>>& components,
+                                      const std::vector<float>& bias)
+{
+    if (components.empty() || bias.size() != components.size()) return features;
+    const size_t n_components = components.size();
+    const size_t expected_cols = features.size();
+    std::vector<float> projected(n_components, 0.0f);
+
+    for (size_t r = 0; r < n_components; ++r) {
+        const auto &row = components[r];
+        if (row.size() != expected_cols) return features; // 维度不一致时直接返回原始特征
+        float acc = bias[r];
+        for (size_t c = 0; c < expected_cols; ++c) acc += features[c] * row[c];
+        projected[r] = acc;
+    }
+    return projected;
+}
+
 } // namespace basic
 } // namespace predictor
 
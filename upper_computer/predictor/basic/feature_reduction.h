@@ -10,6 +10,12 @@ std::vector<float> applyPcaProject(const std::vector<float>& features,
                                    const std::vector<float>& mean,
                                    const std::vector<std::vector<float>>& components);
 
+// 使用预先折叠均值的仿射形式进行PCA投影：y = components * x + bias
+// 其中 bias = -components * mean，省去单独的去均值步骤
+std::vector<float> applyAffineProject(const std::vector<float>& features,
+                                      const std::vector<std::vector<float>>& components,
+                                      const std::vector<float>& bias);
+
 } // namespace basic
 } // namespace predictor
 
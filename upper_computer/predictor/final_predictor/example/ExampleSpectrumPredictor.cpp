@@ -11,6 +11,7 @@
 #include "feature_selection.h"
 #include "feature_reduction.h"
 #include "log.h"
+#include "DataConversionUtils.h"
 #include <fstream>
 #include <iostream>
 #include <sstream>
@@ -22,6 +23,8 @@
 #include <QJsonDocument>
 #include <QJsonObject>
 #include <QJsonArray>
+#include <QDir>
+#include <QFileInfo>
 
 ExampleSpectrumPredictor::ExampleSpectrumPredictor(const std::string& model_path, 
                                      const std::string& model_info_path,
@@ -54,8 +57,12 @@ ExampleSpectrumPredictor::ExampleSpectrumPredictor(const std::string& model_path
                 upper_computer::basic::LogManager::error(std::string("加载模型信息失败: ") + e.what());
             }
 
-            // 加载预处理参数
-            loadPreprocessingParams(preprocessing_params_path);
+            // 加载预处理参数；PCA旁存文件缺失或损坏时不能以未投影的特征推理
+            if (!loadPreprocessingParams(preprocessing_params_path)) {
+                model_loaded_ = false;
+                upper_computer::basic::LogManager::error(std::string("加载预处理参数失败"));
+                return;
+            }
             
             upper_computer::basic::LogManager::info(std::string("光谱预测模型加载成功（使用LibTorch）"));
             upper_computer::basic::LogManager::info(std::string("设备: ") + device_);
@@ -118,7 +125,9 @@ std::map<std::string, float> ExampleSpectrumPredictor::predict(const std::vector
                 }
             }
             if (pca_mean_.size() == preprocessed_spectrum.size() && !pca_components_.empty()) {
-                preprocessed_spectrum = predictor::basic::applyPcaProject(preprocessed_spectrum, pca_mean_, pca_components_);
+                preprocessed_spectrum = pca_bias_.empty()
+                    ? predictor::basic::applyPcaProject(preprocessed_spectrum, pca_mean_, pca_components_)
+                    : predictor::basic::applyAffineProject(preprocessed_spectrum, pca_components_, pca_bias_);
             } else {
                 std::cerr << "PCA维度不匹配，跳过PCA投影" << std::endl;
             }
@@ -220,7 +229,9 @@ std::map<std::string, std::vector<float>> ExampleSpectrumPredictor::predictBatch
                     }
                 }
                 if (pca_mean_.size() == preprocessed_spectrum.size() && !pca_components_.empty()) {
-                    preprocessed_spectrum = predictor::basic::applyPcaProject(preprocessed_spectrum, pca_mean_, pca_components_);
+                    preprocessed_spectrum = pca_bias_.empty()
+                        ? predictor::basic::applyPcaProject(preprocessed_spectrum, pca_mean_, pca_components_)
+                        : predictor::basic::applyAffineProject(preprocessed_spectrum, pca_components_, pca_bias_);
                 } else {
                     std::cerr << "PCA维度不匹配(批量)，跳过PCA投影" << std::endl;
                 }
@@ -303,7 +314,7 @@ std::vector<std::string> ExampleSpectrumPredictor::getWavelengthLabels() const
 
 
 
-void ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& preprocessing_params_path)
+bool ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& preprocessing_params_path)
 {
     // 优先使用Qt JSON解析，避免手写解析的鲁棒性问题
     try {
@@ -311,7 +322,7 @@ void ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& prepro
         if (!qfile.open(QIODevice::ReadOnly | QIODevice::Text)) {
             upper_computer::basic::LogManager::error(std::string("无法打开预处理参数文件: ") + preprocessing_params_path);
             preprocessing_loaded_ = false;
-            return;
+            return false;
         }
         QByteArray data = qfile.readAll();
         qfile.close();
@@ -341,8 +352,45 @@ void ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& prepro
         pca_loaded_ = false;
         pca_mean_.clear();
         pca_components_.clear();
+        pca_bias_.clear();
         if (root.contains("pca") && root.value("pca").isObject()) {
             QJsonObject pca = root.value("pca").toObject();
+            if (pca.contains("mean_file") && pca.contains("components_file")) {
+                // PCA均值与主成分以float32 .npy文件旁存，路径相对于本JSON文件
+                const QDir baseDir = QFileInfo(QString::fromStdString(preprocessing_params_path)).absoluteDir();
+                std::vector<int> meanShape, compShape;
+                std::vector<float> compValues;
+                using upper_computer::basic::DataConversionUtils;
+                if (DataConversionUtils::loadNpyFloat32(baseDir.filePath(pca.value("mean_file").toString()), meanShape, pca_mean_) &&
+                    DataConversionUtils::loadNpyFloat32(baseDir.filePath(pca.value("components_file").toString()), compShape, compValues) &&
+                    compShape.size() == 2) {
+                    const size_t rows = static_cast<size_t>(compShape[0]);
+                    const size_t cols = static_cast<size_t>(compShape[1]);
+                    pca_components_.reserve(rows);
+                    for (size_t r = 0; r < rows; ++r) {
+                        pca_components_.emplace_back(compValues.begin() + r * cols, compValues.begin() + (r + 1) * cols);
+                    }
+                    // 可选：训练侧预先折叠的偏置，存在时以单次仿射运算完成投影
+                    if (pca.contains("bias_file")) {
+                        std::vector<int> biasShape;
+                        if (!DataConversionUtils::loadNpyFloat32(baseDir.filePath(pca.value("bias_file").toString()), biasShape, pca_bias_) ||
+                            pca_bias_.size() != rows) {
+                            upper_computer::basic::LogManager::error(std::string("PCA偏置文件加载失败"));
+                            pca_mean_.clear();
+                            pca_components_.clear();
+                            pca_bias_.clear();
+                            preprocessing_loaded_ = false;
+                            return false;
+                        }
+                    }
+                } else {
+                    upper_computer::basic::LogManager::error(std::string("PCA参数文件加载失败"));
+                    pca_mean_.clear();
+                    pca_components_.clear();
+                    preprocessing_loaded_ = false;
+                    return false;
+                }
+            }
             if (pca.contains("mean") && pca.value("mean").isArray()) {
                 QJsonArray m = pca.value("mean").toArray();
                 pca_mean_.reserve(m.size());
@@ -373,7 +421,7 @@ void ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& prepro
         } else {
             upper_computer::basic::LogManager::error(std::string("预处理参数解析失败（mean或scale为空）。请检查JSON格式与路径。"));
         }
-        return;
+        return true;
     } catch (...) {
         // 回退到原有的简单字符串解析
     }
@@ -382,7 +430,7 @@ void ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& prepro
     if (!file.is_open()) {
         upper_computer::basic::LogManager::error(std::string("无法打开预处理参数文件: ") + preprocessing_params_path);
         preprocessing_loaded_ = false;
-        return;
+        return false;
     }
     std::string line;
     std::string content;
@@ -551,7 +599,9 @@ void ExampleSpectrumPredictor::loadPreprocessingParams(const std::string& prepro
     } catch (const std::exception& e) {
         upper_computer::basic::LogManager::error(std::string("预处理参数解析错误: ") + std::string(e.what()));
         preprocessing_loaded_ = false;
+        return false;
     }
+    return true;
 }
 
 void ExampleSpectrumPredictor::loadModelInfo(const std::string& model_info_path)
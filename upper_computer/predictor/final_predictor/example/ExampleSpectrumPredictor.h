@@ -99,8 +99,9 @@ private:
     /**
      * @brief 加载预处理参数
      * @param preprocessing_params_path 预处理参数文件路径
+     * @return 是否加载成功（文件无法读取或PCA参数文件加载失败时为false）
      */
-    void loadPreprocessingParams(const std::string& preprocessing_params_path);
+    bool loadPreprocessingParams(const std::string& preprocessing_params_path);
     
     // LibTorch预测器
     std::unique_ptr<ExampleLibTorchPredictor> libtorch_predictor_;
@@ -117,6 +118,7 @@ private:
     bool pca_loaded_ = false;
     std::vector<float> pca_mean_;
     std::vector<std::vector<float>> pca_components_; // n_components x n_features
+    std::vector<float> pca_bias_;                    // -components * mean（可选，存在时直接做仿射投影）
     std::function<void(const std::string&)> log_callback_;  // 日志回调函数
     
     // 预处理参数
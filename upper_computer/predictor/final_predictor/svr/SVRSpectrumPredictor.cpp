@@ -7,6 +7,7 @@
 #include <QDir>
 #include <QStandardPaths>
 #include <QCoreApplication>
+#include <QFileInfo>
 #include <cmath>
 #include <algorithm>
 
@@ -14,6 +15,7 @@
 #include "pre_processing.h"
 #include "feature_selection.h"
 #include "feature_reduction.h"
+#include "DataConversionUtils.h"
 
 SVRSpectrumPredictor::SVRSpectrumPredictor(QObject *parent)
     : QObject(parent)
@@ -173,21 +175,45 @@ bool SVRSpectrumPredictor::loadPreprocessingParams(const QString &preprocessingP
         m_hasPCA = true;
         m_pcaNComponents = pcaObj["n_components"].toInt();
         
-        QJsonArray pcaMeanArray = pcaObj["mean"].toArray();
         m_pcaMean.clear();
-        for (const QJsonValue &value : pcaMeanArray) {
-            m_pcaMean.append(value.toDouble());
-        }
-        
-        QJsonArray componentsArray = pcaObj["components"].toArray();
         m_pcaComponents.clear();
-        for (const QJsonValue &value : componentsArray) {
-            QJsonArray componentArray = value.toArray();
-            QVector<double> component;
-            for (const QJsonValue &compValue : componentArray) {
-                component.append(compValue.toDouble());
+        
+        if (pcaObj.contains("components_file") && pcaObj.contains("mean_file")) {
+            // 新格式：PCA均值与主成分以.npy文件旁存，路径相对于本JSON文件
+            const QDir baseDir = QFileInfo(preprocessingParamsPath).absoluteDir();
+            std::vector<int> meanShape, compShape;
+            std::vector<float> meanValues, compValues;
+            using upper_computer::basic::DataConversionUtils;
+            if (!DataConversionUtils::loadNpyFloat32(baseDir.filePath(pcaObj["mean_file"].toString()), meanShape, meanValues) ||
+                !DataConversionUtils::loadNpyFloat32(baseDir.filePath(pcaObj["components_file"].toString()), compShape, compValues) ||
+                compShape.size() != 2) {
+                qDebug() << "加载PCA参数文件失败";
+                return false;
+            }
+            m_pcaMean = DataConversionUtils::stdVectorFloatToQVectorDouble(meanValues);
+            const int rows = compShape[0];
+            const int cols = compShape[1];
+            m_pcaComponents.reserve(rows);
+            for (int r = 0; r < rows; ++r) {
+                m_pcaComponents.append(DataConversionUtils::stdVectorFloatToQVectorDouble(
+                    std::vector<float>(compValues.begin() + r * cols, compValues.begin() + (r + 1) * cols)));
+            }
+        } else {
+            // 旧格式：PCA参数直接内嵌在JSON中
+            QJsonArray pcaMeanArray = pcaObj["mean"].toArray();
+            for (const QJsonValue &value : pcaMeanArray) {
+                m_pcaMean.append(value.toDouble());
+            }
+            
+            QJsonArray componentsArray = pcaObj["components"].toArray();
+            for (const QJsonValue &value : componentsArray) {
+                QJsonArray componentArray = value.toArray();
+                QVector<double> component;
+                for (const QJsonValue &compValue : componentArray) {
+                    component.append(compValue.toDouble());
+                }
+                m_pcaComponents.append(component);
             }
-            m_pcaComponents.append(component);
         }
     } else {
         m_hasPCA = false;